@@ -5,7 +5,7 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
@@ -22,34 +22,69 @@ database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    _client = AsyncIOMotorClient(database_url)
     db = _client[database_name]
 
 # Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
-    """Insert a single document with timestamp"""
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp and return it (including _id)"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
-    # Convert Pydantic model to dict if needed
+    # Convert Pydantic model to dict if needed; id and timestamps are
+    # response-side fields, never client-supplied
     if isinstance(data, BaseModel):
-        data_dict = data.model_dump()
+        data_dict = data.model_dump(exclude={"id", "created_at", "updated_at"})
     else:
         data_dict = data.copy()
 
     data_dict['created_at'] = datetime.now(timezone.utc)
     data_dict['updated_at'] = datetime.now(timezone.utc)
 
-    result = db[collection_name].insert_one(data_dict)
-    return str(result.inserted_id)
+    # insert_one sets _id on data_dict, so the caller gets the full document
+    # back without a follow-up find_one
+    await db[collection_name].insert_one(data_dict)
+    return data_dict
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
-    """Get documents from collection"""
+async def create_documents(collection_name: str, items: list):
+    """Insert many documents with timestamps in one call and return them"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
-    
-    cursor = db[collection_name].find(filter_dict or {})
-    if limit:
+
+    now = datetime.now(timezone.utc)
+    docs = []
+    for data in items:
+        if isinstance(data, BaseModel):
+            data_dict = data.model_dump(exclude={"id", "created_at", "updated_at"})
+        else:
+            data_dict = data.copy()
+        data_dict['created_at'] = now
+        data_dict['updated_at'] = now
+        docs.append(data_dict)
+
+    if docs:
+        # unordered: one round-trip, inserts don't wait on each other
+        await db[collection_name].insert_many(docs, ordered=False)
+    return docs
+
+async def count_fast(collection_name: str, filter_dict: dict = None):
+    """Count documents; with no filter this is an O(1) metadata read, not a scan"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    if not filter_dict:
+        return await db[collection_name].estimated_document_count()
+    return await db[collection_name].count_documents(filter_dict)
+
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None, projection: dict = None):
+    """Get documents from collection, optionally limited to the given fields"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    cursor = db[collection_name].find(filter_dict or {}, projection)
+    # non-positive limits mean "no limit"; to_list rejects negative lengths
+    if limit and limit > 0:
         cursor = cursor.limit(limit)
-    
-    return list(cursor)
+        return await cursor.to_list(length=limit)
+
+    return await cursor.to_list(length=None)
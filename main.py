@@ -1,53 +1,85 @@
+import asyncio
 import os
-from datetime import datetime
+import time
 from typing import List, Optional
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from bson import ObjectId
+from bson.errors import InvalidId
 
-from database import db, create_document, get_documents
+from database import db, create_document, create_documents, get_documents, count_fast
 from schemas import Project, Task, Note
 
-app = FastAPI(title="Project Management API")
+# hot collection handles, bound once instead of a dict lookup per call site
+projects = db["project"] if db is not None else None
+tasks = db["task"] if db is not None else None
+notes = db["note"] if db is not None else None
+
+app = FastAPI(title="Project Management API", default_response_class=ORJSONResponse)
+
+# explicit origins let the CORS middleware use set membership instead of
+# wildcard matching on every request (and play nice with credentials)
+allowed_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "Authorization"],
 )
 
 
+@app.on_event("startup")
+async def ensure_indexes():
+    if db is None:
+        return
+    # text indexes backing the chat keyword search, plus compound indexes
+    # matching the list/chat filter and sort patterns (all idempotent)
+    await asyncio.gather(
+        projects.create_index([("name", "text"), ("description", "text"), ("tags", "text")]),
+        tasks.create_index([("title", "text"), ("description", "text")]),
+        notes.create_index([("content", "text")]),
+        projects.create_index([("status", 1)]),
+        tasks.create_index([("project_id", 1), ("status", 1)]),
+        notes.create_index([("project_id", 1), ("created_at", -1)]),
+    )
+
+
 # Helpers
-class PyObjectId(ObjectId):
-    @staticmethod
-    def __get_validators__():
-        yield PyObjectId.validate
+def to_oid(s: str, detail: str = "Invalid id") -> ObjectId:
+    # ObjectId() validates on construction; no separate is_valid pre-check needed
+    try:
+        return ObjectId(s)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail=detail)
+
+
+# /test collection listing, cached so the health check isn't a round-trip each hit
+_collections_cache = None  # (names, fetched_at)
+_COLLECTIONS_TTL = 60.0
 
-    @staticmethod
-    def validate(v):
-        if isinstance(v, ObjectId):
-            return v
-        if isinstance(v, str) and ObjectId.is_valid(v):
-            return ObjectId(v)
-        raise ValueError("Invalid ObjectId")
+
+async def _collection_names():
+    global _collections_cache
+    now = time.monotonic()
+    if _collections_cache is None or now - _collections_cache[1] > _COLLECTIONS_TTL:
+        _collections_cache = (await db.list_collection_names(), now)
+    return _collections_cache[0]
 
 
 def serialize_doc(doc: dict) -> dict:
+    # mutates in place: docs are one-shot reads, so no defensive copy needed;
+    # datetimes pass through untouched — the JSON layer encodes them natively
     if not doc:
         return doc
-    d = {**doc}
-    if d.get("_id"):
-        d["_id"] = str(d["_id"])
-    # convert datetime to isoformat for timestamps
-    for k, v in list(d.items()):
-        if isinstance(v, datetime):
-            d[k] = v.isoformat()
-    return d
+    if doc.get("_id"):
+        doc["_id"] = str(doc["_id"])
+    return doc
 
 
 # Root endpoints
@@ -57,7 +89,7 @@ def read_root():
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -73,7 +105,7 @@ def test_database():
             response["database_name"] = db.name if hasattr(db, "name") else "Unknown"
             response["connection_status"] = "Connected"
             try:
-                response["collections"] = db.list_collection_names()[:10]
+                response["collections"] = (await _collection_names())[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
                 response["database"] = f"⚠️ Connected but Error: {str(e)[:50]}"
@@ -86,89 +118,140 @@ def test_database():
 
 # Projects
 @app.get("/api/projects")
-def list_projects(status: Optional[str] = None, limit: int = Query(100, le=500)):
+async def list_projects(
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    include: Optional[str] = Query(None, description="Optional extras, e.g. include=notes_count"),
+):
     filt = {"status": status} if status else {}
-    docs = get_documents("project", filt, limit)
-    # attach counts
+    # project only the fields the listing renders; bodies like description stay out
+    docs = await get_documents(
+        "project", filt, limit,
+        projection={"name": 1, "status": 1, "owner": 1, "progress": 1, "tags": 1, "start_date": 1, "end_date": 1},
+    )
+    pids = [str(d["_id"]) for d in docs]
+    include_notes = include is not None and "notes_count" in include.split(",")
+
+    # batch counts: one aggregation per collection instead of 4 queries per project;
+    # the notes aggregation only runs when the caller asked for notes_count
+    queries = [
+        tasks.aggregate([
+            {"$match": {"project_id": {"$in": pids}, "status": {"$in": ["open", "in-progress", "done"]}}},
+            {"$group": {"_id": {"p": "$project_id", "s": "$status"}, "c": {"$sum": 1}}},
+        ]).to_list(length=None),
+    ]
+    if include_notes:
+        queries.append(
+            notes.aggregate([
+                {"$match": {"project_id": {"$in": pids}}},
+                {"$group": {"_id": "$project_id", "c": {"$sum": 1}}},
+            ]).to_list(length=None)
+        )
+    results = await asyncio.gather(*queries)
+
+    task_counts = {}
+    for row in results[0]:
+        task_counts.setdefault(row["_id"]["p"], {})[row["_id"]["s"]] = row["c"]
+
+    note_counts = {row["_id"]: row["c"] for row in results[1]} if include_notes else {}
+
+    out = []
     for d in docs:
-        d["_id"] = str(d["_id"])  # ensure string id
-        pid = d["_id"]
-        d["task_counts"] = {
-            "open": db["task"].count_documents({"project_id": pid, "status": "open"}),
-            "in_progress": db["task"].count_documents({"project_id": pid, "status": "in-progress"}),
-            "done": db["task"].count_documents({"project_id": pid, "status": "done"}),
+        item = Project.model_validate(d).model_dump(mode="json", by_alias=True)
+        pid = item["_id"]
+        counts = task_counts.get(pid, {})
+        item["task_counts"] = {
+            "open": counts.get("open", 0),
+            "in_progress": counts.get("in-progress", 0),
+            "done": counts.get("done", 0),
         }
-        d["notes_count"] = db["note"].count_documents({"project_id": pid})
-    return [serialize_doc(x) for x in docs]
+        if include_notes:
+            item["notes_count"] = note_counts.get(pid, 0)
+        out.append(item)
+    return out
 
 
 @app.post("/api/projects", status_code=201)
-def create_project(project: Project):
-    inserted_id = create_document("project", project)
-    doc = db["project"].find_one({"_id": ObjectId(inserted_id)})
-    return serialize_doc(doc)
+async def create_project(project: Project):
+    doc = await create_document("project", project)
+    return Project.model_validate(doc).model_dump(mode="json", by_alias=True)
 
 
 @app.get("/api/projects/{project_id}")
-def get_project(project_id: str):
-    if not ObjectId.is_valid(project_id):
-        raise HTTPException(status_code=400, detail="Invalid project id")
-    doc = db["project"].find_one({"_id": ObjectId(project_id)})
+async def get_project(project_id: str):
+    doc = await projects.find_one({"_id": to_oid(project_id, "Invalid project id")})
     if not doc:
         raise HTTPException(status_code=404, detail="Project not found")
-    # attach related counts
-    doc = serialize_doc(doc)
+    # attach related counts: grouped task aggregation and note count run concurrently
+    doc = Project.model_validate(doc).model_dump(mode="json", by_alias=True)
+    task_rows, notes_count = await asyncio.gather(
+        tasks.aggregate([
+            {"$match": {"project_id": project_id}},
+            {"$group": {"_id": "$status", "c": {"$sum": 1}}},
+        ]).to_list(length=None),
+        count_fast("note", {"project_id": project_id}),
+    )
+    counts = {row["_id"]: row["c"] for row in task_rows}
     doc["task_counts"] = {
-        "open": db["task"].count_documents({"project_id": project_id, "status": "open"}),
-        "in_progress": db["task"].count_documents({"project_id": project_id, "status": "in-progress"}),
-        "done": db["task"].count_documents({"project_id": project_id, "status": "done"}),
+        "open": counts.get("open", 0),
+        "in_progress": counts.get("in-progress", 0),
+        "done": counts.get("done", 0),
     }
-    doc["notes_count"] = db["note"].count_documents({"project_id": project_id})
+    doc["notes_count"] = notes_count
     return doc
 
 
 # Tasks
 @app.get("/api/tasks")
-def list_tasks(project_id: Optional[str] = None, status: Optional[str] = None, limit: int = Query(200, le=1000)):
+async def list_tasks(project_id: Optional[str] = None, status: Optional[str] = None, limit: int = Query(200, ge=1, le=1000)):
     filt = {}
     if project_id:
         filt["project_id"] = project_id
     if status:
         filt["status"] = status
-    docs = get_documents("task", filt, limit)
-    return [serialize_doc(x) for x in docs]
+    docs = await get_documents("task", filt, limit)
+    return [Task.model_validate(x).model_dump(mode="json", by_alias=True) for x in docs]
 
 
 @app.post("/api/tasks", status_code=201)
-def create_task(task: Task):
-    # validate project exists
-    if not ObjectId.is_valid(task.project_id):
-        raise HTTPException(status_code=400, detail="Invalid project id")
-    if not db["project"].find_one({"_id": ObjectId(task.project_id)}):
+async def create_task(task: Task):
+    # validate project exists: _id-only projection keeps this an index-covered check
+    if not await projects.find_one({"_id": to_oid(task.project_id, "Invalid project id")}, {"_id": 1}):
         raise HTTPException(status_code=404, detail="Project not found")
-    inserted_id = create_document("task", task)
-    doc = db["task"].find_one({"_id": ObjectId(inserted_id)})
-    return serialize_doc(doc)
+    doc = await create_document("task", task)
+    return Task.model_validate(doc).model_dump(mode="json", by_alias=True)
+
+
+@app.post("/api/tasks/bulk", status_code=201)
+async def create_tasks_bulk(payload: List[Task]):
+    if not payload:
+        return []
+    # validate all referenced projects with a single $in query
+    oids = {t.project_id: to_oid(t.project_id, "Invalid project id") for t in payload}
+    found = await projects.find({"_id": {"$in": list(oids.values())}}, {"_id": 1}).to_list(length=None)
+    found_ids = {str(d["_id"]) for d in found}
+    missing = [pid for pid in oids if pid not in found_ids]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Project not found: {', '.join(missing)}")
+    docs = await create_documents("task", payload)
+    return [Task.model_validate(d).model_dump(mode="json", by_alias=True) for d in docs]
 
 
 # Notes
 @app.get("/api/notes")
-def list_notes(project_id: Optional[str] = None, limit: int = Query(200, le=1000)):
+async def list_notes(project_id: Optional[str] = None, limit: int = Query(200, ge=1, le=1000)):
     filt = {"project_id": project_id} if project_id else {}
-    docs = get_documents("note", filt, limit)
-    return [serialize_doc(x) for x in docs]
+    docs = await get_documents("note", filt, limit)
+    return [Note.model_validate(x).model_dump(mode="json", by_alias=True) for x in docs]
 
 
 @app.post("/api/notes", status_code=201)
-def create_note(note: Note):
-    # validate project exists
-    if not ObjectId.is_valid(note.project_id):
-        raise HTTPException(status_code=400, detail="Invalid project id")
-    if not db["project"].find_one({"_id": ObjectId(note.project_id)}):
+async def create_note(note: Note):
+    # validate project exists: _id-only projection keeps this an index-covered check
+    if not await projects.find_one({"_id": to_oid(note.project_id, "Invalid project id")}, {"_id": 1}):
         raise HTTPException(status_code=404, detail="Project not found")
-    inserted_id = create_document("note", note)
-    doc = db["note"].find_one({"_id": ObjectId(inserted_id)})
-    return serialize_doc(doc)
+    doc = await create_document("note", note)
+    return Note.model_validate(doc).model_dump(mode="json", by_alias=True)
 
 
 # Simple Chatbot over project data
@@ -182,57 +265,84 @@ class ChatResponse(BaseModel):
 
 
 @app.post("/api/chat", response_model=ChatResponse)
-def chat_with_projects(payload: ChatRequest):
+async def chat_with_projects(payload: ChatRequest):
     q = (payload.message or "").strip().lower()
     if not q:
         return ChatResponse(reply="Ask me anything about your projects, tasks, or notes.")
+    if len(q) < 3:
+        # 1-2 char queries match nearly everything; don't bother scanning
+        return ChatResponse(reply="Please give me at least 3 characters to search on.")
 
-    # naive keyword search across name, description, tags, notes, task titles
-    proj_matches = list(
-        db["project"].find({
-            "$or": [
-                {"name": {"$regex": q, "$options": "i"}},
-                {"description": {"$regex": q, "$options": "i"}},
-                {"tags": {"$elemMatch": {"$regex": q, "$options": "i"}}},
-            ]
-        }).limit(10)
-    )
-
-    # also look into tasks and notes for matches and collect project_ids
-    task_proj_ids = db["task"].distinct("project_id", {"$or": [
-        {"title": {"$regex": q, "$options": "i"}},
-        {"description": {"$regex": q, "$options": "i"}},
-    ]})
-
-    note_proj_ids = db["note"].distinct("project_id", {"content": {"$regex": q, "$options": "i"}})
-
-    extra_proj_ids = set(list(task_proj_ids) + list(note_proj_ids))
-    for pid in extra_proj_ids:
-        try:
-            if ObjectId.is_valid(pid):
-                doc = db["project"].find_one({"_id": ObjectId(pid)})
-                if doc:
-                    proj_matches.append(doc)
-        except Exception:
-            continue
-
-    # deduplicate
+    # stream matches straight into the dedup pipeline instead of draining
+    # each cursor into an intermediate list first
     seen = set()
     unique = []
-    for p in proj_matches:
-        pid = str(p.get("_id"))
-        if pid not in seen:
+
+    async def collect_projects(cursor):
+        async for p in cursor:
+            pid = str(p["_id"])
+            if pid in seen:
+                continue
             seen.add(pid)
             unique.append(p)
+            if len(unique) >= 10:
+                break
+
+    # keyword search across name, description, tags, notes, task titles:
+    # text-index lookup, ranked by relevance
+    text_q = {"$text": {"$search": q}}
+    await collect_projects(
+        projects.find(text_q, {"_id": 1, "name": 1})
+        .sort([("score", {"$meta": "textScore"})])
+        .limit(10)
+    )
+
+    # only widen the search through tasks/notes if direct matches left room
+    if len(unique) < 10:
+        task_proj_ids, note_proj_ids = await asyncio.gather(
+            tasks.distinct("project_id", text_q),
+            notes.distinct("project_id", text_q),
+        )
+        extra_proj_ids = set(list(task_proj_ids) + list(note_proj_ids))
+        # `seen` doubles as a per-request cache: ids already matched directly
+        # don't need to be fetched again
+        extra_oids = [
+            ObjectId(pid) for pid in extra_proj_ids
+            if pid not in seen and ObjectId.is_valid(pid)
+        ]
+        if extra_oids:
+            await collect_projects(projects.find({"_id": {"$in": extra_oids}}, {"_id": 1, "name": 1}))
+
+    # batch the per-project context fetches: one aggregation per collection,
+    # skipped entirely when nothing matched
+    pids = [str(p["_id"]) for p in unique[:10]]
+    tasks_by_pid = {}
+    notes_by_pid = {}
+    if pids:
+        task_rows, note_rows = await asyncio.gather(
+            tasks.aggregate([
+                {"$match": {"project_id": {"$in": pids}, "status": {"$in": ["open", "in-progress"]}}},
+                {"$project": {"title": 1, "status": 1, "project_id": 1}},
+                {"$group": {"_id": "$project_id", "tasks": {"$push": "$$ROOT"}}},
+                {"$project": {"tasks": {"$slice": ["$tasks", 5]}}},
+            ]).to_list(length=None),
+            notes.aggregate([
+                {"$match": {"project_id": {"$in": pids}}},
+                {"$sort": {"created_at": -1}},
+                {"$project": {"content": 1, "author": 1, "created_at": 1, "project_id": 1}},
+                {"$group": {"_id": "$project_id", "notes": {"$push": "$$ROOT"}}},
+                {"$project": {"notes": {"$slice": ["$notes", 3]}}},
+            ]).to_list(length=None),
+        )
+        tasks_by_pid = {row["_id"]: row["tasks"] for row in task_rows}
+        notes_by_pid = {row["_id"]: row["notes"] for row in note_rows}
 
     related = []
     for p in unique[:10]:
         sp = serialize_doc(p)
         pid = sp["_id"]
-        open_tasks = list(db["task"].find({"project_id": pid, "status": {"$in": ["open", "in-progress"]}}).limit(5))
-        sp["open_tasks"] = [serialize_doc(t) for t in open_tasks]
-        notes = list(db["note"].find({"project_id": pid}).sort("created_at", -1).limit(3))
-        sp["recent_notes"] = [serialize_doc(n) for n in notes]
+        sp["open_tasks"] = [serialize_doc(t) for t in tasks_by_pid.get(pid, [])]
+        sp["recent_notes"] = [serialize_doc(n) for n in notes_by_pid.get(pid, [])]
         related.append(sp)
 
     if not related:
@@ -11,11 +11,26 @@ Model name is converted to lowercase for the collection name:
 - BlogPost -> "blogs" collection
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
-from datetime import date
+from datetime import date, datetime
 
-class Project(BaseModel):
+
+class MongoModel(BaseModel):
+    """Shared base: maps Mongo's _id and insert timestamps onto the model"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: Optional[str] = Field(None, alias="_id", description="Document id")
+    created_at: Optional[datetime] = Field(None, description="Set on insert")
+    updated_at: Optional[datetime] = Field(None, description="Set on insert")
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def _stringify_id(cls, v):
+        return str(v) if v is not None else v
+
+
+class Project(MongoModel):
     """
     Projects collection schema
     Collection name: "project"
@@ -30,7 +45,7 @@ class Project(BaseModel):
     priority: Optional[str] = Field(None, description="Priority: low, medium, high, critical")
     tags: List[str] = Field(default_factory=list, description="Hashtags/labels")
 
-class Task(BaseModel):
+class Task(MongoModel):
     """
     Tasks collection schema
     Collection name: "task"
@@ -43,7 +58,7 @@ class Task(BaseModel):
     due_date: Optional[date] = Field(None, description="Due date")
     priority: Optional[str] = Field(None, description="Priority: low, medium, high, critical")
 
-class Note(BaseModel):
+class Note(MongoModel):
     """
     Notes collection schema
     Collection name: "note"